@@ -4,102 +4,435 @@ import sqlite3
 import os
 import tempfile
 import hashlib
+import hmac
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from tkinter import ttk, messagebox
 from tkinter import filedialog
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
+# === PASSWORD HASHING ===
+
+# Stored as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>". Rows written
+# before this format are bare unsalted sha256 hex digests; they still verify
+# and are re-hashed on the user's next successful login.
+PASSWORD_SCHEME = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = 600_000
+
+def hash_password(password):
+    """Return a salted PBKDF2 hash string for storing in users.password."""
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PASSWORD_ITERATIONS)
+    return f"{PASSWORD_SCHEME}${PASSWORD_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+def verify_password(password, stored):
+    """Check a password against a stored hash (PBKDF2 or legacy sha256)."""
+    if not stored.startswith(PASSWORD_SCHEME + "$"):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    _, iterations, salt, digest = stored.split("$")
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate.hex(), digest)
+
+def password_needs_rehash(stored):
+    """True if a stored hash predates the current scheme or iteration count."""
+    return not stored.startswith(f"{PASSWORD_SCHEME}${PASSWORD_ITERATIONS}$")
+
 # === DATABASE SETUP ===
 
+DB_PATH = "inventory.db"
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection (sqlite3 default is 128)
+
+def connect_db(read_only=False):
+    """Open a connection to the inventory database with the app's PRAGMA tuning.
+
+    Connections are in autocommit mode (isolation_level=None): a lone write
+    statement commits by itself, and anything that must be atomic goes through
+    transaction() explicitly.
+    """
+    if read_only:
+        connection = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, isolation_level=None,
+                                     cached_statements=STATEMENT_CACHE_SIZE)
+    else:
+        connection = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+        # WAL + NORMAL sync means commits no longer fsync (only checkpoints do)
+        connection.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+        """)
+    # Reads are served from mmap / a 64MB page cache. With the writer, log
+    # writer and DB worker connections sharing the file, wait up to 60s for a
+    # lock instead of failing with "database is locked" after the 5s default.
+    connection.executescript("""
+        PRAGMA busy_timeout=60000;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-65536;
+    """)
+    return connection
+
 # Connect to SQLite database
-conn = sqlite3.connect("inventory.db")
+conn = connect_db()
 cursor = conn.cursor()
 
-# Create inventory table if it doesn't exist
-cursor.execute('''CREATE TABLE IF NOT EXISTS inventory (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    item_name TEXT NOT NULL,
-    quantity INTEGER NOT NULL,
-    price REAL NOT NULL
-)''')
-
-# Create invoices table if it doesn't exist
-cursor.execute('''CREATE TABLE IF NOT EXISTS invoices (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    supplier_name TEXT NOT NULL,
-    invoice_number TEXT NOT NULL,
-    date TEXT NOT NULL
-)''')
-conn.commit()
-
-# Create users table if it doesn't exist
-cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL,
-    role TEXT NOT NULL CHECK(role IN ('admin', 'viewer'))
-)''')
-
-# Create logs table if it doesn't exist
-cursor.execute('''CREATE TABLE IF NOT EXISTS logs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT NOT NULL,
-    action TEXT NOT NULL,
-    timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-)''')
-
-# Add 'deleted' column to inventory if missing (for soft delete)
-cursor.execute("PRAGMA table_info(inventory)")
-if 'deleted' not in [col[1] for col in cursor.fetchall()]:
-    cursor.execute("ALTER TABLE inventory ADD COLUMN deleted INTEGER DEFAULT 0")
-
-# Add 'deleted' column to invoices if missing (for soft delete)
-cursor.execute("PRAGMA table_info(invoices)")
-if 'deleted' not in [col[1] for col in cursor.fetchall()]:
-    cursor.execute("ALTER TABLE invoices ADD COLUMN deleted INTEGER DEFAULT 0")
-conn.commit()
-
-# Add 'deleted_at' column to inventory if missing (timestamp for deletion)
-cursor.execute("PRAGMA table_info(inventory)")
-if 'deleted_at' not in [col[1] for col in cursor.fetchall()]:
-    cursor.execute("ALTER TABLE inventory ADD COLUMN deleted_at TEXT")
-
-# Add 'deleted_at' column to invoices if missing (timestamp for deletion)
-cursor.execute("PRAGMA table_info(invoices)")
-if 'deleted_at' not in [col[1] for col in cursor.fetchall()]:
-    cursor.execute("ALTER TABLE invoices ADD COLUMN deleted_at TEXT")
-
-conn.commit()
-
-# === ADMIN USER SETUP ===
-
-# Create default admin user with hashed password if no users exist
-cursor.execute("SELECT COUNT(*) FROM users")
-if cursor.fetchone()[0] == 0:
-    hashed_admin_pw = hashlib.sha256("admin".encode()).hexdigest()
-    cursor.execute(
-        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-        ("admin", hashed_admin_pw, "admin")
-    )
-    conn.commit()
+@contextmanager
+def transaction(connection=None, mode="IMMEDIATE"):
+    """Run the enclosed statements in one explicit BEGIN ... COMMIT, rolling back on error.
+
+    Writes take the lock up front (BEGIN IMMEDIATE) so a transaction never
+    fails half way through upgrading to a writer; pass mode="DEFERRED" for
+    a read-only snapshot.
+    """
+    connection = connection or conn
+    connection.execute(f"BEGIN {mode}")
+    try:
+        yield connection
+    except BaseException:
+        connection.rollback()
+        raise
+    connection.commit()
+
+def add_column_if_missing(table, name, decl):
+    """ALTER a column onto a table, treating "already there" as success."""
+    try:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" not in str(e):
+            raise
+
+# Bumped whenever bootstrap_schema changes. A database already at this
+# version skips the bootstrap entirely, so a normal start is one PRAGMA.
+SCHEMA_VERSION = 2
+
+def bootstrap_schema():
+    """Create/upgrade tables, indexes and the default admin in a single transaction."""
+    # Connections are in autocommit mode, so the single transaction is explicit
+    cursor.execute("BEGIN IMMEDIATE")
+
+    # Create inventory table if it doesn't exist
+    cursor.execute('''CREATE TABLE IF NOT EXISTS inventory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_name TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        price REAL NOT NULL
+    )''')
+
+    # Create invoices table if it doesn't exist
+    cursor.execute('''CREATE TABLE IF NOT EXISTS invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        supplier_name TEXT NOT NULL,
+        invoice_number TEXT NOT NULL,
+        date TEXT NOT NULL
+    )''')
+
+    # Create users table if it doesn't exist
+    cursor.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'viewer'))
+    )''')
+
+    # Create logs table if it doesn't exist
+    cursor.execute('''CREATE TABLE IF NOT EXISTS logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        action TEXT NOT NULL,
+        timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+    # Add soft delete columns ('deleted' flag and 'deleted_at' timestamp) if missing
+    for table in ("inventory", "invoices"):
+        add_column_if_missing(table, "deleted", "INTEGER DEFAULT 0")
+        add_column_if_missing(table, "deleted_at", "TEXT")
+
+    # Partial indexes keep the active/deleted list queries off full table scans.
+    # idx_inv_active_cover also carries quantity/price (id is the rowid), so the
+    # inventory page, totals and low-stock queries never touch the table itself;
+    # SQLite only treats it as covering if the WHERE column is in it too.
+    cursor.execute("DROP INDEX IF EXISTS idx_inv_active")
+    cursor.execute("""CREATE INDEX IF NOT EXISTS idx_inv_active_cover
+                      ON inventory(item_name, quantity, price, deleted) WHERE deleted = 0""")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inv_deleted ON inventory(deleted_at) WHERE deleted = 1")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_active ON invoices(invoice_number) WHERE deleted = 0")
+    # Plain ascending index: its implicit rowid tail lets SQLite walk it backwards
+    # for ORDER BY timestamp DESC, id DESC. The old DESC index still needed a
+    # temp b-tree sort for the id tie-breaker.
+    cursor.execute("DROP INDEX IF EXISTS idx_logs_ts")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_time ON logs(timestamp)")
+
+    # Case-insensitive index so search_items' prefix LIKE can seek instead of scan
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inv_name_nocase ON inventory(item_name COLLATE NOCASE) WHERE deleted = 0")
+
+    # Rows are updated/deleted by id now, so the old item_name lookup index is dead weight
+    cursor.execute("DROP INDEX IF EXISTS idx_inv_name")
+
+    # Single definition of "active inventory" for every list/export query; SQLite
+    # flattens the view, so the deleted = 0 partial indexes above still apply
+    cursor.execute('''CREATE VIEW IF NOT EXISTS v_active_inventory AS
+        SELECT id, item_name, quantity, price FROM inventory WHERE deleted = 0''')
+
+    # Trigram full-text index over item names, so search_items' substring search
+    # is an index lookup rather than a LIKE scan. It is an external-content table
+    # kept in step with inventory by triggers. Needs FTS5 with the trigram
+    # tokenizer (SQLite 3.34+); without it, search falls back to LIKE.
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'")
+    if cursor.fetchone() is None:
+        try:
+            cursor.execute('''CREATE VIRTUAL TABLE inventory_fts USING fts5(
+                item_name, content='inventory', content_rowid='id', tokenize='trigram'
+            )''')
+        except sqlite3.OperationalError:
+            pass  # this SQLite build has no FTS5 / trigram tokenizer
+        else:
+            cursor.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+            cursor.execute('''CREATE TRIGGER inventory_fts_ai AFTER INSERT ON inventory BEGIN
+                INSERT INTO inventory_fts(rowid, item_name) VALUES (new.id, new.item_name);
+            END''')
+            cursor.execute('''CREATE TRIGGER inventory_fts_ad AFTER DELETE ON inventory BEGIN
+                INSERT INTO inventory_fts(inventory_fts, rowid, item_name) VALUES ('delete', old.id, old.item_name);
+            END''')
+            cursor.execute('''CREATE TRIGGER inventory_fts_au AFTER UPDATE OF item_name ON inventory BEGIN
+                INSERT INTO inventory_fts(inventory_fts, rowid, item_name) VALUES ('delete', old.id, old.item_name);
+                INSERT INTO inventory_fts(rowid, item_name) VALUES (new.id, new.item_name);
+            END''')
+
+    # Give the planner real statistics for the indexes above the first time round;
+    # after that, PRAGMA optimize on exit keeps them current.
+    # users(username) needs no extra index: its UNIQUE constraint already has one.
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    if cursor.fetchone() is None:
+        cursor.execute("ANALYZE")
+
+    # Create default admin user with hashed password if no users exist
+    cursor.execute("SELECT 1 FROM users LIMIT 1")
+    if cursor.fetchone() is None:
+        hashed_admin_pw = hash_password("admin")
+        cursor.execute(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            ("admin", hashed_admin_pw, "admin")
+        )
 
-# Fix legacy plain-text password for admin
-cursor.execute("SELECT password FROM users WHERE username = 'admin'")
-row = cursor.fetchone()
-if row and row[0] == "admin":  # still plain text
-    hashed = hashlib.sha256("admin".encode()).hexdigest()
-    cursor.execute("UPDATE users SET password = ? WHERE username = 'admin'", (hashed,))
+    # Fix legacy plain-text password for admin. The check is a single probe of
+    # the username index and hashes nothing unless the row really is plain text.
+    cursor.execute("SELECT 1 FROM users WHERE username = 'admin' AND password = 'admin'")
+    if cursor.fetchone():
+        hashed = hash_password("admin")
+        cursor.execute("UPDATE users SET password = ? WHERE username = 'admin'", (hashed,))
+
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
 
+cursor.execute("PRAGMA user_version")
+if cursor.fetchone()[0] < SCHEMA_VERSION:
+    bootstrap_schema()
+
+cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'")
+HAS_INVENTORY_FTS = cursor.fetchone() is not None
+
+# Read-only connection for the Treeview loaders. Under WAL its reads never
+# wait on (or block) the writer connection above.
+read_conn = connect_db(read_only=True)
+read_cursor = read_conn.cursor()
+
+# === SQL STATEMENTS ===
+
+# Shared statement text: one definition per query, and the exact same string
+# each time so sqlite3's per-connection statement cache is always hit
+SQL_LIST_INV = "SELECT item_name, quantity, price FROM v_active_inventory"
+SQL_INVOICE_ROWS = "SELECT id, supplier_name, invoice_number, date FROM invoices WHERE deleted = 0"
+# Both full-report sections in one statement, tagged by section. UNION ALL
+# emits its arms in order, so the inventory rows all come before the invoices.
+SQL_FULL_REPORT = ("SELECT 'inventory', item_name, quantity, price FROM v_active_inventory "
+                   "UNION ALL SELECT 'invoices', supplier_name, invoice_number, date FROM invoices WHERE deleted = 0")
+SQL_INV_TOTALS = ("SELECT COUNT(*), COALESCE(SUM(quantity), 0), COALESCE(SUM(quantity * price), 0) "
+                  "FROM v_active_inventory")
+SQL_INV_PAGE = "SELECT id, item_name, quantity, price FROM v_active_inventory ORDER BY item_name LIMIT ? OFFSET ?"
+SQL_INV_LOW_STOCK = "SELECT item_name, quantity FROM v_active_inventory WHERE quantity < 5"
+# Search results are paged like the inventory. NOCASE ordering lets a prefix
+# LIKE read idx_inv_name_nocase already sorted.
+SQL_INV_SEARCH = ("SELECT id, item_name, quantity, price FROM v_active_inventory WHERE item_name LIKE ? ESCAPE '\\' "
+                  "ORDER BY item_name COLLATE NOCASE LIMIT ? OFFSET ?")
+SQL_INV_SEARCH_FTS = ("SELECT i.id, i.item_name, i.quantity, i.price FROM inventory_fts "
+                      "JOIN v_active_inventory i ON i.id = inventory_fts.rowid WHERE inventory_fts MATCH ? "
+                      "ORDER BY i.item_name COLLATE NOCASE LIMIT ? OFFSET ?")
+SQL_INV_ANY = "SELECT EXISTS(SELECT 1 FROM v_active_inventory)"
+SQL_LOG_INSERT = "INSERT INTO logs (username, action, timestamp) VALUES (?, ?, ?)"
+SQL_LOG_PAGE = "SELECT id, username, action, timestamp FROM logs ORDER BY timestamp DESC, id DESC LIMIT ?"
+SQL_LOG_PAGE_BEFORE = ("SELECT id, username, action, timestamp FROM logs WHERE (timestamp, id) < (?, ?) "
+                       "ORDER BY timestamp DESC, id DESC LIMIT ?")
+SQL_RECYCLE_ROWS = "SELECT id, item_name, quantity, price, deleted_at FROM inventory WHERE deleted = 1"
+SQL_RESTORE_ITEM = "UPDATE inventory SET deleted = 0, deleted_at = NULL WHERE id = ?"
+SQL_PURGE_ITEM = "DELETE FROM inventory WHERE id = ?"
+SQL_INSERT_ITEM = "INSERT INTO inventory (item_name, quantity, price) VALUES (?, ?, ?)"
+SQL_UPDATE_ITEM = "UPDATE inventory SET quantity = ?, price = ? WHERE id = ?"
+SQL_SOFT_DELETE_ITEM = "UPDATE inventory SET deleted = 1, deleted_at = ? WHERE id = ?"
+SQL_INSERT_INVOICE = "INSERT INTO invoices (supplier_name, invoice_number, date) VALUES (?, ?, ?)"
+SQL_LOGIN = "SELECT role, password FROM users WHERE username = ?"
+SQL_SET_PASSWORD = "UPDATE users SET password = ? WHERE username = ?"
+
+# Pre-bound row formatters for the report/preview loops
+FMT_REPORT_ITEM = "{} | Qty: {} | Price: ${:.2f}".format
+FMT_REPORT_INVOICE = "{} | Invoice: {} | Date: {}".format
+
+# Full report sections, in SQL_FULL_REPORT order: (tag, heading, row formatter)
+REPORT_SECTIONS = (
+    ("inventory", "Inventory Items", FMT_REPORT_ITEM),
+    ("invoices", "Invoices", FMT_REPORT_INVOICE),
+)
+FMT_PREVIEW_ROW = "{:<30}{:<15}{:<10.2f}\n".format
+
+# === QUERY HELPERS ===
+
+FETCH_BATCH_SIZE = 1000
+PAGE_SIZE = 200  # rows shown per Treeview page
+CSV_WRITE_BUFFER = 1 << 20
+
+def fetch_in_batches(cur, size=FETCH_BATCH_SIZE):
+    """Yield the rows of an executed cursor, fetching them in fixed-size batches."""
+    cur.arraysize = size  # fetchmany() default, so each call pulls a full batch
+    while rows := cur.fetchmany():
+        yield from rows
+
+# The bulk_add_* helpers accept any iterable: executemany pulls rows from it
+# one at a time, so a generator over a CSV reader is never held in memory.
+# They write through `connection` (default: the UI writer connection).
+def bulk_add_items(rows, connection=None):
+    """Insert (item_name, quantity, price) rows with one executemany in one transaction."""
+    with transaction(connection) as connection:
+        cur = connection.executemany(SQL_INSERT_ITEM, rows)
+    return cur.rowcount
+
+def bulk_add_invoices(rows, connection=None):
+    """Insert (supplier_name, invoice_number, date) rows with one executemany in one transaction."""
+    with transaction(connection) as connection:
+        cur = connection.executemany(SQL_INSERT_INVOICE, rows)
+    return cur.rowcount
+
+def like_escape(term):
+    """Escape LIKE wildcards in user input (use with ESCAPE '\\')."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def fts_phrase(term):
+    """Quote user input as one FTS5 phrase (a substring match under the trigram tokenizer)."""
+    return '"' + term.replace('"', '""') + '"'
+
+# Results of read_conn queries, reused until the database changes. Every
+# write in the app is committed on some other connection (UI writer, log
+# writer, DB worker), and any such commit bumps read_conn's data_version.
+QUERY_CACHE_SIZE = 64
+_query_cache = {}
+_query_cache_version = None
+
+def cached_query(sql, params=()):
+    """Return all rows of a read_conn query, from cache if nothing has been committed since."""
+    global _query_cache_version
+    version = read_cursor.execute("PRAGMA data_version").fetchone()[0]
+    if version != _query_cache_version or len(_query_cache) >= QUERY_CACHE_SIZE:
+        _query_cache.clear()
+        _query_cache_version = version
+    key = (sql, params)
+    rows = _query_cache.get(key)
+    if rows is None:
+        rows = _query_cache[key] = read_cursor.execute(sql, params).fetchall()
+    return rows
+
+# === BACKGROUND DB WORKER ===
+
+# Slow reads (exports, log pages) run on a single worker thread so the Tk
+# mainloop keeps repainting. sqlite3 connections are bound to the thread
+# that opened them, so the worker opens its own.
+_worker = threading.local()
+
+def _init_db_worker():
+    _worker.conn = connect_db()
+
+db_executor = ThreadPoolExecutor(max_workers=1, initializer=_init_db_worker, thread_name_prefix="db-worker")
+
+def worker_connection():
+    """Return the DB worker thread's connection (call from worker tasks only)."""
+    return _worker.conn
+
+def worker_cursor():
+    """Return a cursor on the DB worker thread's connection (call from worker tasks only)."""
+    return _worker.conn.cursor()
+
+def check_login(username, password):
+    """Return the user's role if the password matches, else None (runs on the DB worker).
+
+    PBKDF2 is deliberately slow, so this stays off the Tk thread.
+    """
+    cursor = worker_cursor()
+    # One lookup on the username's unique index; the hash is checked here
+    cursor.execute(SQL_LOGIN, (username,))
+    result = cursor.fetchone()
+    if not result or not verify_password(password, result[1]):
+        return None
+    if password_needs_rehash(result[1]):
+        cursor.execute(SQL_SET_PASSWORD, (hash_password(password), username))
+    return result[0]
+
 # === LOGGING FUNCTION ===
 
+# Log rows are queued and written by a daemon thread in batches, so a user
+# action never waits on the logs INSERT/commit
+LOG_BATCH_SIZE = 64
+LOG_FLUSH_INTERVAL = 0.25  # seconds to collect a batch after the first entry
+
+_log_queue = queue.Queue()
+# Entries whose batch still failed after a retry. The writer prepends them to
+# its next batch, and flush_logs() reports them so the UI can warn the user.
+_unwritten_logs = []
+
 def log_action(username, action):
-    """Log user actions to the logs table."""
+    """Queue a user action for the logs table."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute("INSERT INTO logs (username, action, timestamp) VALUES (?, ?, ?)",
-                    (username, action, timestamp))
-    conn.commit()
+    _log_queue.put((username, action, timestamp))
+
+def flush_logs():
+    """Block until the log queue is drained; return how many entries could not be written."""
+    _log_queue.join()
+    return len(_unwritten_logs)
+
+def _write_log_batch(log_conn, rows):
+    """Insert log rows in one transaction, retrying once; return True if they were written."""
+    for attempt in range(2):
+        try:
+            with transaction(log_conn):
+                log_conn.executemany(SQL_LOG_INSERT, rows)
+            return True
+        except sqlite3.Error:
+            if attempt:
+                logging.exception("Could not write %d activity log entries", len(rows))
+                return False
+            time.sleep(LOG_FLUSH_INTERVAL)
+
+def _log_writer():
+    """Drain the log queue, inserting each batch in a single transaction."""
+    log_conn = connect_db()
+    while True:
+        batch = [_log_queue.get()]
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            try:
+                batch.append(_log_queue.get(timeout=max(0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        rows = _unwritten_logs + batch
+        # Updated before task_done, so flush_logs() sees the outcome
+        _unwritten_logs[:] = [] if _write_log_batch(log_conn, rows) else rows
+        for _ in batch:
+            _log_queue.task_done()
+
+threading.Thread(target=_log_writer, name="log-writer", daemon=True).start()
 
 # === MAIN APPLICATION CLASS ===
 
@@ -114,7 +447,7 @@ class InventoryApp(tk.Tk):
 
         header_canvas = tk.Canvas(self, height=60)
         header_canvas.pack(fill="x")
-        draw_gradient(header_canvas, 1000, 60, "#007acc", "#f2f2f2")
+        self.header_image = draw_gradient(header_canvas, 1000, 60, "#007acc", "#f2f2f2")  # keep a reference
         header_canvas.create_text(500, 30, text="Inventory Management System", fill="white", font=("Segoe UI", 16, "bold"))
 
         self.tabs = ttk.Notebook(self)
@@ -135,16 +468,26 @@ class InventoryApp(tk.Tk):
         self.tabs.add(self.settings_tab, text="Settings")
         self.tabs.add(self.recycle_tab, text="Recycle Bin")
 
+        # Only the default tab is built up front; the others (and their DB
+        # loads) are built the first time the user switches to them
         self.create_inventory_tab()
-        self.create_invoice_tab()
+        self._tab_builders = {
+            str(self.invoice_tab): self.create_invoice_tab,
+            str(self.settings_tab): self.create_settings_tab,
+            str(self.recycle_tab): self.create_recycle_tab,
+        }
         if self.role == "admin":
-            self.create_user_tab()
-            self.create_log_tab()
-        self.create_settings_tab()
-        self.create_recycle_tab()
+            self._tab_builders[str(self.user_tab)] = self.create_user_tab
+            self._tab_builders[str(self.log_tab)] = self.create_log_tab
+        self.tabs.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         self.protocol("WM_DELETE_WINDOW", self.on_app_close)
 
+    def _on_tab_changed(self, event):
+        build = self._tab_builders.pop(str(self.tabs.select()), None)
+        if build:
+            build()
+
     def setup_style(self):
         style = ttk.Style(self)
         style.theme_use("clam")
@@ -205,51 +548,33 @@ class InventoryApp(tk.Tk):
     def on_app_close(self):
         if messagebox.askokcancel("Exit", "Do you want to close the application?"):
             log_action(self.username, "Closed application")
+            unwritten = flush_logs()
+            if unwritten:
+                messagebox.showwarning("Activity Log", f"{unwritten} activity log entries could not be saved.")
+            # Refresh planner stats for any table that changed a lot this session
+            cursor.execute("PRAGMA optimize")
             self.destroy()
 
-    def export_all_to_pdf(self):
-        filename = filedialog.asksaveasfilename(defaultextension=".pdf", initialfile="full_report.pdf",
-                                                filetypes=[("PDF files", "*.pdf")])
-        if not filename:
-            return
-
-        c = canvas.Canvas(filename, pagesize=letter)
-        width, height = letter
-        y = height - 50
+    def run_in_background(self, func, on_done, *args, on_error=None):
+        """Run func(*args) on the DB worker and hand its result to on_done on the Tk thread.
 
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(180, y, "Full Inventory and Invoice Report")
-        y -= 40
+        If func raises, the error is shown and on_error() (if given) is called instead.
+        """
+        future = db_executor.submit(func, *args)
+        self.after(50, self._poll_future, future, on_done, on_error)
 
-        # Inventory Section
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, y, "Inventory Items")
-        y -= 20
-        cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0")
-        for item in cursor.fetchall():
-            c.setFont("Helvetica", 10)
-            c.drawString(60, y, f"{item[0]} | Qty: {item[1]} | Price: ${item[2]:.2f}")
-            y -= 15
-            if y < 50:
-                c.showPage()
-                y = height - 50
-
-        # Invoices Section
-        y -= 20
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, y, "Invoices")
-        y -= 20
-        cursor.execute("SELECT supplier_name, invoice_number, date FROM invoices WHERE deleted = 0")
-        for inv in cursor.fetchall():
-            c.setFont("Helvetica", 10)
-            c.drawString(60, y, f"{inv[0]} | Invoice: {inv[1]} | Date: {inv[2]}")
-            y -= 15
-            if y < 50:
-                c.showPage()
-                y = height - 50
-
-        c.save()
-        messagebox.showinfo("Export Complete", f"Full report saved to:\n{filename}")
+    def _poll_future(self, future, on_done, on_error=None):
+        if not future.done():
+            self.after(50, self._poll_future, future, on_done, on_error)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Background task failed: {e}")
+            if on_error:
+                on_error()
+            return
+        on_done(result)
 
     def create_inventory_tab(self):
         self.minsize(1000, 720)  # Ensure minimum height
@@ -270,8 +595,9 @@ class InventoryApp(tk.Tk):
         ttk.Label(entry_frame, text="Price").grid(row=0, column=2, padx=5)
 
         self.item_name = tk.StringVar()
-        self.quantity = tk.IntVar()
-        self.price = tk.DoubleVar()
+        # Plain StringVars: the numbers are parsed once, on Add/Update
+        self.quantity = tk.StringVar(value="0")
+        self.price = tk.StringVar(value="0.0")
 
         ttk.Entry(entry_frame, textvariable=self.item_name).grid(row=1, column=0, padx=5)
         ttk.Entry(entry_frame, textvariable=self.quantity).grid(row=1, column=1, padx=5)
@@ -292,6 +618,17 @@ class InventoryApp(tk.Tk):
         ttk.Button(search_frame, text="🔍 Search", command=self.search_items).pack(side="left", padx=5)
         ttk.Button(search_frame, text="❌ Clear", command=self.load_inventory).pack(side="left", padx=5)
 
+        # Paging (only one page of rows is loaded into the tree at a time).
+        # While a search is shown, Prev/Next page through its results instead.
+        self.inventory_page = 0
+        self.search_query = None  # (sql, pattern) of the search being shown
+        self.search_page = 0
+        self.search_has_more = False
+        ttk.Button(search_frame, text="Next ▶", command=self.next_inventory_page).pack(side="right", padx=5)
+        self.page_label = ttk.Label(search_frame, text="")
+        self.page_label.pack(side="right", padx=5)
+        ttk.Button(search_frame, text="◀ Prev", command=self.prev_inventory_page).pack(side="right", padx=5)
+
         # Treeview Area
         tree_frame = ttk.Frame(main_frame)
         tree_frame.grid(row=2, column=0, sticky="nsew", pady=(10, 5))
@@ -305,6 +642,7 @@ class InventoryApp(tk.Tk):
         self.tree.heading("Quantity", text="Quantity")
         self.tree.heading("Price", text="Price")
         self.tree.bind("<<TreeviewSelect>>", self.load_selected_item)
+        self._row_cache = {}  # iid -> (name, qty, price) of the rows currently in self.tree (see _sync_tree)
 
         scroll_y.config(command=self.tree.yview)
         scroll_x.config(command=self.tree.xview)
@@ -341,55 +679,71 @@ class InventoryApp(tk.Tk):
         if not filename:
             return
 
+        self.run_in_background(
+            self._write_full_report, lambda _: messagebox.showinfo("Export Complete", f"Full report saved to:\n{filename}"),
+            filename
+        )
+
+    def _write_full_report(self, filename):
+        """Render the full report PDF (runs on the DB worker thread)."""
+        cursor = worker_cursor()
         c = canvas.Canvas(filename, pagesize=letter)
         width, height = letter
         y = height - 50
 
+        def write_lines(lines, y):
+            """Write lines from y down, one text object per page; returns the next free y."""
+            text = c.beginText(60, y)
+            text.setFont("Helvetica", 10, leading=15)  # textLine advances by the leading
+            for line in lines:
+                text.textLine(line)
+                if text.getY() < 50:
+                    c.drawText(text)
+                    c.showPage()
+                    text = c.beginText(60, height - 50)
+                    text.setFont("Helvetica", 10, leading=15)
+            c.drawText(text)
+            return text.getY()
+
         c.setFont("Helvetica-Bold", 16)
         c.drawString(180, y, "Full Inventory and Invoice Report")
         y -= 40
 
-        # Inventory Section
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, y, "Inventory Items")
-        y -= 20
-        cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0")
-        for item in cursor.fetchall():
-            c.setFont("Helvetica", 10)
-            c.drawString(60, y, f"{item[0]} | Qty: {item[1]} | Price: ${item[2]:.2f}")
-            y -= 15
-            if y < 50:
-                c.showPage()
-                y = height - 50
-
-        # Invoices Section
-        y -= 20
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, y, "Invoices")
-        y -= 20
-        cursor.execute("SELECT supplier_name, invoice_number, date FROM invoices WHERE deleted = 0")
-        for inv in cursor.fetchall():
-            c.setFont("Helvetica", 10)
-            c.drawString(60, y, f"{inv[0]} | Invoice: {inv[1]} | Date: {inv[2]}")
-            y -= 15
-            if y < 50:
-                c.showPage()
-                y = height - 50
+        # One query drives every section; a section with no rows still gets its heading
+        cursor.execute(SQL_FULL_REPORT)
+        groups = groupby(fetch_in_batches(cursor), key=itemgetter(0))
+        kind, rows = next(groups, (None, ()))
+        for section, title, fmt in REPORT_SECTIONS:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(50, y, title)
+            y -= 20
+            if kind == section:
+                y = write_lines((fmt(*row[1:]) for row in rows), y)
+                kind, rows = next(groups, (None, ()))
+            y -= 20
 
         c.save()
-        messagebox.showinfo("Export Complete", f"Full report saved to:\n{filename}")
+
+    def _parse_quantity_price(self):
+        """Return the form's (quantity, price), or None after warning the user if either is invalid."""
+        try:
+            return int(self.quantity.get()), float(self.price.get())
+        except ValueError:
+            messagebox.showwarning("Input Error", "Quantity must be a whole number and price a number.")
+            return None
 
     def add_item(self):
         name = self.item_name.get().strip()
-        qty = self.quantity.get()
-        price = self.price.get()
-
         if not name:
             messagebox.showwarning("Input Error", "Item name is required.")
             return
 
-        cursor.execute("INSERT INTO inventory (item_name, quantity, price) VALUES (?, ?, ?)", (name, qty, price))
-        conn.commit()
+        parsed = self._parse_quantity_price()
+        if parsed is None:
+            return
+        qty, price = parsed
+
+        cursor.execute(SQL_INSERT_ITEM, (name, qty, price))
         log_action(self.username, f"Added item: {name}")
         self.load_inventory()
 
@@ -399,13 +753,13 @@ class InventoryApp(tk.Tk):
             messagebox.showwarning("Selection Error", "Please select an item to update.")
             return
 
-        values = self.tree.item(selected, "values")
         name = self.item_name.get().strip()
-        qty = self.quantity.get()
-        price = self.price.get()
+        parsed = self._parse_quantity_price()
+        if parsed is None:
+            return
+        qty, price = parsed
 
-        cursor.execute("UPDATE inventory SET quantity = ?, price = ? WHERE item_name = ?", (qty, price, values[0]))
-        conn.commit()
+        cursor.execute(SQL_UPDATE_ITEM, (qty, price, int(selected)))
         log_action(self.username, f"Updated item: {name}")
         self.load_inventory()
 
@@ -415,72 +769,149 @@ class InventoryApp(tk.Tk):
             messagebox.showwarning("Selection Error", "Please select an item to delete.")
             return
 
-        values = self.tree.item(selected, "values")
+        item_name, qty, price = self._row_cache[selected]
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute("UPDATE inventory SET deleted = 1, deleted_at = ? WHERE item_name = ?", (timestamp, values[0]))
-        conn.commit()
-        log_action(self.username, f"Soft deleted item: {values[0]}")
+        cursor.execute(SQL_SOFT_DELETE_ITEM, (timestamp, int(selected)))
+        log_action(self.username, f"Soft deleted item: {item_name}")
         self.load_inventory()
+        # Once built, the recycle bin is patched in place rather than reloaded
+        if str(self.recycle_tab) not in self._tab_builders:
+            self.recycle_tree.insert("", tk.END, iid=selected, values=(item_name, qty, price, timestamp))
 
     def load_selected_item(self, event):
         selected = self.tree.focus()
-        if selected:
-            values = self.tree.item(selected, "values")
+        values = self._row_cache.get(selected)  # avoids a Tcl round-trip per selection
+        if values:
             self.item_name.set(values[0])
             self.quantity.set(values[1])
             self.price.set(values[2])
 
+    def _sync_tree(self, tree, shown, rows):
+        """Make `tree` show `rows`, in order, touching only the rows that changed.
+
+        `rows` yields (iid, values, tags); `shown` maps iid -> values for what
+        the tree holds now and is updated in place.
+        """
+        wanted = {str(iid): (tuple(values), tags) for iid, values, tags in rows}
+
+        stale = [iid for iid in shown if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                del shown[iid]
+
+        for index, (iid, (values, tags)) in enumerate(wanted.items()):
+            old = shown.get(iid)
+            if old is None:
+                tree.insert("", index, iid=iid, values=values, tags=tags)
+            elif old != values:
+                tree.item(iid, values=values, tags=tags)
+            shown[iid] = values
+
+        # Existing rows keep their relative order, so this only fires if the
+        # sort order itself moved under them
+        order = list(wanted)
+        if list(tree.get_children()) != order:
+            for index, iid in enumerate(order):
+                tree.move(iid, "", index)
+
     def load_inventory(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-            self.low_stock_list.delete(0, tk.END)
-
-        total_quantity = 0
-        total_value = 0
-        item_count = 0
-
-        cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0")
-        for item_name, quantity, price in cursor.fetchall():
-            tag = "low" if quantity < 5 else ""
-            self.tree.insert("", tk.END, values=(item_name, quantity, price), tags=(tag,))
-            item_count += 1
-            total_quantity += quantity
-            total_value += quantity * price
-            
-            if quantity < 5:
-                self.low_stock_list.insert(tk.END, f"{item_name} - Qty: {quantity}")
+        self.search_query = None  # the full inventory replaces any search results
+        # One read transaction: totals, page and low-stock list all come from
+        # the same snapshot, even if a writer commits in between
+        with transaction(read_conn, "DEFERRED"):
+            # Totals cover every active item, not just the page being shown
+            item_count, total_quantity, total_value = cached_query(SQL_INV_TOTALS)[0]
+
+            page_count = max(1, -(-item_count // PAGE_SIZE))
+            self.inventory_page = min(self.inventory_page, page_count - 1)
+
+            page = cached_query(SQL_INV_PAGE, (PAGE_SIZE, self.inventory_page * PAGE_SIZE))
+            low_stock = cached_query(SQL_INV_LOW_STOCK)
+
+        # Only rows added, removed or edited since the last load touch the widget
+        self._sync_tree(self.tree, self._row_cache, (
+            (item_id, row, ("low" if row[1] < 5 else "",)) for item_id, *row in page
+        ))
+
+        # Listbox.insert takes any number of items: one Tcl call for the whole list
+        self.low_stock_list.delete(0, tk.END)
+        self.low_stock_list.insert(tk.END, *[f"{item_name} - Qty: {quantity}" for item_name, quantity in low_stock])
 
         self.tree.tag_configure("low", foreground="red")
 
+        self.page_label.config(text=f"Page {self.inventory_page + 1} of {page_count}")
         self.summary_label.config(
             text=f"Total Items: {item_count} | Total Quantity: {total_quantity} | Total Value: ${total_value:.2f}"
         )
 
+    def next_inventory_page(self):
+        if self.search_query:
+            if self.search_has_more:
+                self.search_page += 1
+                self._load_search_page()
+            return
+        self.inventory_page += 1
+        self.load_inventory()  # clamps back to the last page if we ran past it
+
+    def prev_inventory_page(self):
+        if self.search_query:
+            if self.search_page > 0:
+                self.search_page -= 1
+                self._load_search_page()
+        elif self.inventory_page > 0:
+            self.inventory_page -= 1
+            self.load_inventory()
+
     def search_items(self):
-        term = self.search_term.get().lower()
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0 AND lower(item_name) LIKE ?", (f"%{term}%",))
-        for item in cursor.fetchall():
-            self.tree.insert("", tk.END, values=item)
-        selected = self.user_tree.focus()
-        if not selected:
+        raw_term = self.search_term.get().strip()
+        if not raw_term:
+            self.load_inventory()  # an empty search is just the paged inventory
             return
-        username = self.user_tree.item(selected, "values")[0]
-        if username == "admin":
-            messagebox.showwarning("Protected User", "The default admin user cannot be deleted.")
+        term = like_escape(raw_term)
+
+        self.search_page = 0
+        if HAS_INVENTORY_FTS and len(raw_term) >= 3:
+            # The trigram index answers the full substring match (prefix hits
+            # included) without scanning
+            self.search_query = (SQL_INV_SEARCH_FTS, fts_phrase(raw_term))
+            self._load_search_page()
             return
-        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete user '{username}'?"):
-            cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-            conn.commit()
-            log_action(self.username, f"Deleted user: {username}")
-            self.load_users()
+
+        # Trigrams need at least 3 characters: try a prefix match, which can
+        # seek idx_inv_name_nocase, before falling back to a LIKE scan
+        self.search_query = (SQL_INV_SEARCH, f"{term}%")
+        if not self._load_search_page():
+            self.search_query = (SQL_INV_SEARCH, f"%{term}%")
+            self._load_search_page()
+
+    def _load_search_page(self):
+        """Show page `search_page` of the active search; return its rows."""
+        sql, pattern = self.search_query
+        # One extra row tells us whether there is a next page without a COUNT
+        rows = cached_query(sql, (pattern, PAGE_SIZE + 1, self.search_page * PAGE_SIZE))
+        self.search_has_more = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+        self._sync_tree(self.tree, self._row_cache, (
+            (item_id, item, ("low" if item[1] < 5 else "",)) for item_id, *item in rows
+        ))
+        more = ", more ▶" if self.search_has_more else ""
+        self.page_label.config(text=f"Results page {self.search_page + 1}{more}")
+        return rows
 
     def export_inventory_pdf(self):
         filename = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not filename:
             return
 
+        self.run_in_background(
+            self._write_inventory_pdf, lambda _: messagebox.showinfo("Export Complete", f"Inventory exported to {filename}"),
+            filename
+        )
+
+    def _write_inventory_pdf(self, filename):
+        """Render the inventory PDF (runs on the DB worker thread)."""
+        cursor = worker_cursor()
         c = canvas.Canvas(filename, pagesize=letter)
         width, height = letter
         y = height - 50
@@ -500,21 +931,29 @@ class InventoryApp(tk.Tk):
         c.drawString(350, y, "Price")
         y -= 20
 
-        # Data
-        cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0")
-        for name, qty, price in cursor.fetchall():
-            c.setFont("Helvetica", 10)
-            c.drawString(50, y, str(name))
-            c.drawString(250, y, str(qty))
-            c.drawString(350, y, f"${price:.2f}")
+        # Data: one text object (a single BT ... ET block) per page rather than
+        # a separate drawString text object for every cell
+        cursor.execute(SQL_LIST_INV)
+        text = c.beginText()
+        text.setFont("Helvetica", 10)
+        for name, qty, price in fetch_in_batches(cursor):
+            text.setTextOrigin(50, y)
+            text.textOut(name)  # TEXT columns already come back as str
+            text.setXPos(200)  # setXPos is relative to the current line start: x=250
+            text.textOut(str(qty))
+            text.setXPos(100)  # x=350
+            text.textOut(f"${price:.2f}")
             y -= 15
 
             if y < 50:
+                c.drawText(text)
                 c.showPage()
+                text = c.beginText()
+                text.setFont("Helvetica", 10)
                 y = height - 50
 
+        c.drawText(text)
         c.save()
-        messagebox.showinfo("Export Complete", f"Inventory exported to {filename}")
 
     def import_inventory_csv(self):
         file_path = filedialog.askopenfilename(
@@ -524,9 +963,11 @@ class InventoryApp(tk.Tk):
         if not file_path:
             return
 
-        imported_count = 0
-        with open(file_path, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
+        self.run_in_background(self._import_inventory_file, self._show_inventory_import, file_path)
+
+    def _import_inventory_file(self, file_path):
+        """Parse and insert an inventory CSV, returning the row count (runs on the DB worker thread)."""
+        def valid_rows(reader):
             for row in reader:
                 name = row.get("Item Name", "").strip()
                 try:
@@ -536,11 +977,12 @@ class InventoryApp(tk.Tk):
                     continue  # skip rows with invalid numbers
 
                 if name:
-                    cursor.execute("INSERT INTO inventory (item_name, quantity, price) VALUES (?, ?, ?)",
-                                (name, quantity, price))
-                    imported_count += 1
+                    yield name, quantity, price
+
+        with open(file_path, newline="", encoding="utf-8") as csvfile:
+            return bulk_add_items(valid_rows(csv.DictReader(csvfile)), worker_connection())
 
-        conn.commit()
+    def _show_inventory_import(self, imported_count):
         log_action(self.username, f"Imported {imported_count} items from CSV")
         self.load_inventory()
         messagebox.showinfo("Import Complete", f"{imported_count} items imported.")
@@ -550,38 +992,49 @@ class InventoryApp(tk.Tk):
         if not file_path:
             return
 
-        with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+        # 1MB write buffer; writerows pulls rows straight from the cursor
+        with open(file_path, mode="w", newline="", encoding="utf-8", buffering=CSV_WRITE_BUFFER) as file:
             writer = csv.writer(file)
             writer.writerow(["Item Name", "Quantity", "Price"])
-            cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0")
-            for row in cursor.fetchall():
-                writer.writerow(row)
+            writer.writerows(read_cursor.execute(SQL_LIST_INV))
 
         messagebox.showinfo("Export Complete", f"Inventory exported to:\n{file_path}")
 
     def print_inventory_preview(self):
-        cursor.execute("SELECT item_name, quantity, price FROM inventory WHERE deleted = 0")
-        items = cursor.fetchall()
+        self.run_in_background(self._write_inventory_preview, self._show_print_prompt)
+
+    def _write_inventory_preview(self):
+        """Write the preview text to a temp file and return its path, or None if there is nothing to print.
+
+        Runs on the DB worker thread.
+        """
+        cursor = worker_cursor()
+        cursor.execute(SQL_INV_ANY)
+        if not cursor.fetchone()[0]:
+            return None
+
+        cursor.execute(SQL_LIST_INV)
+        header = (
+            "Inventory Report\n\n"
+            f"{'Item Name':<30}{'Quantity':<15}{'Price':<10}\n"
+            + "-" * 60 + "\n"
+        )
+
+        # Stream the formatted rows straight into the file instead of growing one string
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as temp_file:
+            temp_file.write(header)
+            temp_file.writelines(FMT_PREVIEW_ROW(*item) for item in fetch_in_batches(cursor))
+        return temp_file.name
 
-        if not items:
+    def _show_print_prompt(self, preview_path):
+        if preview_path is None:
             messagebox.showinfo("No Data", "No inventory data to print.")
             return
 
-        preview_text = "Inventory Report\n\n"
-        preview_text += f"{'Item Name':<30}{'Quantity':<15}{'Price':<10}\n"
-        preview_text += "-" * 60 + "\n"
-        for item in items:
-            name, qty, price = item
-            preview_text += f"{name:<30}{qty:<15}{price:<10.2f}\n"
-
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8")
-        temp_file.write(preview_text)
-        temp_file.close()
-
         should_print = messagebox.askyesno("Print Preview", "Preview saved. Open print dialog?")
         if should_print:
             try:
-                os.startfile(temp_file.name, "print")
+                os.startfile(preview_path, "print")
             except Exception as e:
                 messagebox.showerror("Print Error", f"Could not send to printer.\n{e}")
 
@@ -612,6 +1065,7 @@ class InventoryApp(tk.Tk):
         for col in ("Supplier", "Invoice Number", "Date"):
             self.invoice_tree.heading(col, text=col)
         self.invoice_tree.pack(fill="both", expand=True)
+        self._invoice_rows = {}  # iid (invoice id) -> values currently in self.invoice_tree
 
         self.load_invoices()
 
@@ -623,22 +1077,23 @@ class InventoryApp(tk.Tk):
         if not file_path:
             return
 
-        imported_count = 0
-        with open(file_path, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
+        self.run_in_background(self._import_invoice_file, self._show_invoice_import, file_path)
+
+    def _import_invoice_file(self, file_path):
+        """Parse and insert an invoice CSV, returning the row count (runs on the DB worker thread)."""
+        def valid_rows(reader):
             for row in reader:
                 name = row.get("Supplier Name", "").strip()
                 number = row.get("Invoice Number", "").strip()
                 date = row.get("Date", "").strip()
 
                 if name and number and date:
-                    cursor.execute(
-                        "INSERT INTO invoices (supplier_name, invoice_number, date) VALUES (?, ?, ?)",
-                        (name, number, date)
-                    )
-                    imported_count += 1
+                    yield name, number, date
+
+        with open(file_path, newline="", encoding="utf-8") as csvfile:
+            return bulk_add_invoices(valid_rows(csv.DictReader(csvfile)), worker_connection())
 
-        conn.commit()
+    def _show_invoice_import(self, imported_count):
         log_action(self.username, f"Imported {imported_count} invoices from CSV")
         self.load_invoices()
         messagebox.showinfo("Import Complete", f"{imported_count} invoices imported successfully.")
@@ -652,20 +1107,13 @@ class InventoryApp(tk.Tk):
             messagebox.showwarning("Input Error", "All invoice fields are required.")
             return
 
-        cursor.execute(
-            "INSERT INTO invoices (supplier_name, invoice_number, date) VALUES (?, ?, ?)",
-            (name, number, date)
-        )
-        conn.commit()
+        cursor.execute(SQL_INSERT_INVOICE, (name, number, date))
         log_action(self.username, f"Added invoice: {number}")
         self.load_invoices()
 
     def load_invoices(self):
-        for row in self.invoice_tree.get_children():
-            self.invoice_tree.delete(row)
-        cursor.execute("SELECT supplier_name, invoice_number, date FROM invoices WHERE deleted = 0")
-        for row in cursor.fetchall():
-            self.invoice_tree.insert("", tk.END, values=row)
+        self._sync_tree(self.invoice_tree, self._invoice_rows,
+                        ((invoice_id, row, ()) for invoice_id, *row in cached_query(SQL_INVOICE_ROWS)))
 
     def create_user_tab(self):
         frame = ttk.Frame(self.user_tab)
@@ -705,17 +1153,30 @@ class InventoryApp(tk.Tk):
             messagebox.showwarning("Input Error", "All user fields are required.")
             return
 
+        # PBKDF2 is deliberately slow, so hash and insert on the DB worker
+        self.run_in_background(self._insert_user, self._show_user_added, username, password, role)
+
+    def _insert_user(self, username, password, role):
+        """Hash the password and add the user (runs on the DB worker thread).
+
+        Returns the username, or None if it is already taken.
+        """
         try:
-            hashed_pw = hashlib.sha256(password.encode()).hexdigest()
-            cursor.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", (username, hashed_pw, role))
-            conn.commit()
-            log_action(self.username, f"Added user: {username}")
-            self.load_users()
-            self.new_username.set("")
-            self.new_password.set("")
-            self.new_role.set("")
+            worker_cursor().execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                                    (username, hash_password(password), role))
         except sqlite3.IntegrityError:
+            return None
+        return username
+
+    def _show_user_added(self, username):
+        if username is None:
             messagebox.showerror("Error", "Username already exists.")
+            return
+        log_action(self.username, f"Added user: {username}")
+        self.load_users()
+        self.new_username.set("")
+        self.new_password.set("")
+        self.new_role.set("")
 
     def delete_user(self):
         selected = self.user_tree.focus()
@@ -729,15 +1190,13 @@ class InventoryApp(tk.Tk):
 
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete user '{username}'?"):
             cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-            conn.commit()
             log_action(self.username, f"Deleted user: {username}")
             self.load_users()
 
     def load_users(self):
-        for row in self.user_tree.get_children():
-            self.user_tree.delete(row)
-        cursor.execute("SELECT username, role FROM users")
-        for row in cursor.fetchall():
+        self.user_tree.delete(*self.user_tree.get_children())
+        read_cursor.execute("SELECT username, role FROM users")
+        for row in read_cursor:
             self.user_tree.insert("", tk.END, values=row)
 
     def logout_user(self):
@@ -756,24 +1215,75 @@ class InventoryApp(tk.Tk):
         self.log_tree.heading("Timestamp", text="Timestamp")
 
         self.log_tree.pack(fill="both", expand=True)
-        ttk.Button(frame, text="Clear All Logs", command=self.clear_logs).pack(anchor="e", pady=(10, 0))
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill="x", pady=(10, 0))
+        ttk.Button(btn_frame, text="◀ Newer", command=self.prev_log_page).pack(side="left")
+        ttk.Button(btn_frame, text="Older ▶", command=self.next_log_page).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Clear All Logs", command=self.clear_logs).pack(side="right")
 
         self.load_logs()
 
     def clear_logs(self):
         if messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete all activity logs?"):
-            cursor.execute("DELETE FROM logs")
-            conn.commit()
-            log_action(self.username, "Cleared all activity logs")
+            # The wipe and its own log entry share one commit instead of two
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with transaction():
+                cursor.execute("DELETE FROM logs")
+                cursor.execute(SQL_LOG_INSERT, (self.username, "Cleared all activity logs", timestamp))
             self.load_logs()
             messagebox.showinfo("Logs Cleared", "All logs have been successfully deleted.")
 
-    def load_logs(self):
-        for row in self.log_tree.get_children():
-            self.log_tree.delete(row)
-        cursor.execute("SELECT username, action, timestamp FROM logs ORDER BY timestamp DESC")
-        for row in cursor.fetchall():
-            self.log_tree.insert("", tk.END, values=row)
+    def load_logs(self, before=None):
+        """Show one page of logs, newest first, older than the (timestamp, id) key `before`."""
+        if before is None:
+            self.log_page_keys = []  # start keys of the newer pages, for paging back
+        self.log_page_start = before
+        # Paging clicks are ignored until this page is shown; until then the
+        # end key of the previous page is stale
+        self.log_page_end = None
+        self._log_fetch_pending = True
+        self.run_in_background(self._fetch_log_page, self._show_log_page, before,
+                               on_error=self._log_fetch_failed)
+
+    def _fetch_log_page(self, before):
+        """Fetch one page of log rows (runs on the DB worker thread)."""
+        unwritten = flush_logs()  # include actions still waiting in the log queue
+        cursor = worker_cursor()
+        # Keyset pagination: seek past the previous page via idx_logs_time instead of OFFSET
+        if before is None:
+            cursor.execute(SQL_LOG_PAGE, (PAGE_SIZE,))
+        else:
+            cursor.execute(SQL_LOG_PAGE_BEFORE, (*before, PAGE_SIZE))
+        return cursor.fetchall(), unwritten  # at most one page
+
+    def _log_fetch_failed(self):
+        self._log_fetch_pending = False
+
+    def _show_log_page(self, result):
+        rows, unwritten = result
+        self._log_fetch_pending = False
+        if unwritten:
+            messagebox.showwarning("Activity Log",
+                                   f"{unwritten} activity log entries could not be saved yet; they will be retried.")
+        self.log_tree.delete(*self.log_tree.get_children())
+        # Straight Tcl calls skip ttk's per-row option formatting in Treeview.insert
+        call, path = self.log_tree.tk.call, str(self.log_tree)
+        for log_id, username, action, timestamp in rows:
+            call(path, "insert", "", "end", "-values", (username, action, timestamp))
+        self.log_page_end = (rows[-1][3], rows[-1][0]) if len(rows) == PAGE_SIZE else None
+
+    def next_log_page(self):
+        if not self._log_fetch_pending and self.log_page_end is not None:
+            keys = self.log_page_keys + [self.log_page_start]
+            self.load_logs(self.log_page_end)
+            self.log_page_keys = keys
+
+    def prev_log_page(self):
+        if not self._log_fetch_pending and self.log_page_keys:
+            keys = self.log_page_keys[:-1]
+            self.load_logs(self.log_page_keys[-1])
+            self.log_page_keys = keys
 
     def create_settings_tab(self):
         frame = ttk.Frame(self.settings_tab)
@@ -815,40 +1325,58 @@ class InventoryApp(tk.Tk):
         btn_frame.pack(fill="x")
 
         ttk.Button(btn_frame, text="Restore Selected", command=self.restore_deleted_item).pack(side="left")
-        ttk.Button(btn_frame, text="Permanently Delete", command=self.permanently_delete_item).pack(side="right")
+        ttk.Button(btn_frame, text="Empty Bin", command=self.empty_recycle_bin).pack(side="right")
+        ttk.Button(btn_frame, text="Permanently Delete", command=self.permanently_delete_item).pack(side="right", padx=5)
 
         self.load_recycle_bin()
 
     def load_recycle_bin(self):
-        for row in self.recycle_tree.get_children():
-            self.recycle_tree.delete(row)
-        cursor.execute("SELECT item_name, quantity, price, deleted_at FROM inventory WHERE deleted = 1")
-        for row in cursor.fetchall():
-            self.recycle_tree.insert("", tk.END, values=row)
+        self.recycle_tree.delete(*self.recycle_tree.get_children())
+        read_cursor.execute(SQL_RECYCLE_ROWS)
+        call, path = self.recycle_tree.tk.call, str(self.recycle_tree)
+        for item_id, *row in read_cursor:
+            call(path, "insert", "", "end", "-id", item_id, "-values", row)
 
     def restore_deleted_item(self):
-        selected = self.recycle_tree.focus()
+        selected = self.recycle_tree.selection()
         if not selected:
             return
 
-        item_name = self.recycle_tree.item(selected, "values")[0]
-        cursor.execute("UPDATE inventory SET deleted = 0, deleted_at = NULL WHERE item_name = ?", (item_name,))
-        conn.commit()
-        log_action(self.username, f"Restored item: {item_name}")
-        self.load_recycle_bin()
+        item_names = [self.recycle_tree.item(iid, "values")[0] for iid in selected]
+        with transaction():
+            cursor.executemany(SQL_RESTORE_ITEM, [(int(iid),) for iid in selected])
+        for item_name in item_names:
+            log_action(self.username, f"Restored item: {item_name}")
+        self.recycle_tree.delete(*selected)
         self.load_inventory()
 
     def permanently_delete_item(self):
-        selected = self.recycle_tree.focus()
+        selected = self.recycle_tree.selection()
         if not selected:
             return
 
-        item_name = self.recycle_tree.item(selected, "values")[0]
-        if messagebox.askyesno("Confirm Delete", f"Permanently delete '{item_name}'?"):
-            cursor.execute("DELETE FROM inventory WHERE item_name = ?", (item_name,))
-            conn.commit()
-            log_action(self.username, f"Permanently deleted item: {item_name}")
-            self.load_recycle_bin()
+        item_names = [self.recycle_tree.item(iid, "values")[0] for iid in selected]
+        if len(item_names) == 1:
+            prompt = f"Permanently delete '{item_names[0]}'?"
+        else:
+            prompt = f"Permanently delete {len(item_names)} items?"
+        if messagebox.askyesno("Confirm Delete", prompt):
+            # Every selected row goes in one executemany / one commit
+            with transaction():
+                cursor.executemany(SQL_PURGE_ITEM, [(int(iid),) for iid in selected])
+            for item_name in item_names:
+                log_action(self.username, f"Permanently deleted item: {item_name}")
+            self.recycle_tree.delete(*selected)
+
+    def empty_recycle_bin(self):
+        if not self.recycle_tree.get_children():
+            return
+
+        if messagebox.askyesno("Confirm Delete", "Permanently delete every item in the recycle bin?"):
+            with transaction():
+                cursor.execute("DELETE FROM inventory WHERE deleted = 1")
+            log_action(self.username, f"Emptied recycle bin ({cursor.rowcount} items)")
+            self.recycle_tree.delete(*self.recycle_tree.get_children())
 
 # === LOGIN WINDOW ===
 
@@ -871,39 +1399,62 @@ def login_window():
     def attempt_login():
         username = username_entry.get()
         password = password_entry.get()
-        hashed_pw = hashlib.sha256(password.encode()).hexdigest()
-        cursor.execute("SELECT role FROM users WHERE username = ? AND password = ?", (username, hashed_pw))
-        result = cursor.fetchone()
-        if result:
-            role = result[0]
-            log_action(username, "Logged in")
-            login.destroy()
-            app = InventoryApp(username, role)
-            app.mainloop()
-        else:
+        login_button.config(state="disabled")  # no double submits while hashing
+        future = db_executor.submit(check_login, username, password)
+        login.after(50, finish_login, future, username)
+
+    def finish_login(future, username):
+        if not future.done():
+            login.after(50, finish_login, future, username)
+            return
+        login_button.config(state="normal")
+        try:
+            role = future.result()
+        except Exception as e:
+            messagebox.showerror("Login Failed", f"Could not check credentials: {e}")
+            return
+        if role is None:
             messagebox.showerror("Login Failed", "Incorrect username or password.")
+            return
+        log_action(username, "Logged in")
+        login.destroy()
+        app = InventoryApp(username, role)
+        app.mainloop()
 
-    ttk.Button(login, text="Login", command=attempt_login).pack(pady=5)
+    login_button = ttk.Button(login, text="Login", command=attempt_login)
+    login_button.pack(pady=5)
 
     login.mainloop()
 
 # === GRADIENT DRAWING FUNCTION ===
 
+@lru_cache(maxsize=8)
+def gradient_colors(start_rgb, end_rgb, steps):
+    """Return a tuple of `steps` '#rrggbb' colors running from start_rgb towards end_rgb.
+
+    The RGB tuples are 16-bit per channel, as returned by winfo_rgb. Results
+    are memoized, so redrawing the same header (e.g. after logging out and
+    back in) reuses them.
+    """
+    channels = [
+        [(start + (end - start) * i // steps) >> 8 for i in range(steps)]
+        for start, end in zip(start_rgb, end_rgb)
+    ]
+    return tuple(f'#{r:02x}{g:02x}{b:02x}' for r, g, b in zip(*channels))
+
 def draw_gradient(canvas, width, height, start_color, end_color):
-    """Draw a vertical gradient on a canvas."""
-    r1, g1, b1 = canvas.winfo_rgb(start_color)
-    r2, g2, b2 = canvas.winfo_rgb(end_color)
-
-    r_ratio = (r2 - r1) / height
-    g_ratio = (g2 - g1) / height
-    b_ratio = (b2 - b1) / height
-
-    for i in range(height):
-        nr = int(r1 + (r_ratio * i)) >> 8
-        ng = int(g1 + (g_ratio * i)) >> 8
-        nb = int(b1 + (b_ratio * i)) >> 8
-        color = f'#{nr:02x}{ng:02x}{nb:02x}'
-        canvas.create_line(0, i, width, i, fill=color)
+    """Draw a vertical gradient on a canvas as a single image item.
+
+    Returns the PhotoImage, which the caller must keep referenced.
+    """
+    colors = gradient_colors(canvas.winfo_rgb(start_color), canvas.winfo_rgb(end_color), height)
+
+    # One put: Tk tiles the 1px-wide column (one single-pixel row per
+    # scanline) across the whole "to" region
+    image = tk.PhotoImage(master=canvas, width=width, height=height)
+    image.put(" ".join(f"{{{color}}}" for color in colors), to=(0, 0, width, height))
+    canvas.create_image(0, 0, anchor="nw", image=image)
+    return image
 
 # === MAIN ENTRY POINT ===
 